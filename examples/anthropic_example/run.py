@@ -5,15 +5,15 @@ Install: pip install anthropic promptvault
 Set env: ANTHROPIC_API_KEY=your-key
 """
 
+import asyncio
 import os
-import json
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 from promptvault import PromptVault
 
-client = Anthropic(api_key=os.environ["ANTHROPIC_API_KEY"])
+client = AsyncAnthropic(api_key=os.environ["ANTHROPIC_API_KEY"])
 vault  = PromptVault("../../prompts", log_file="./usage.jsonl")
+MODEL  = "claude-haiku-4-5-20251001"
 
-# ── Code review ────────────────────────────────────────────────────────────────
 code = """
 def get_user(user_id):
     query = "SELECT * FROM users WHERE id = " + user_id
@@ -21,41 +21,8 @@ def get_user(user_id):
     return result[0]
 """
 
-prompt  = vault.load("code_review")
-rendered = prompt.render(code=code, language="python")
-
-response = client.messages.create(
-    model="claude-haiku-4-5-20251001",
-    max_tokens=512,
-    messages=[{"role": "user", "content": rendered}],
-)
-review = response.content[0].text
-print("Code review:\n", review)
-
-vault.log("code_review", version=prompt.version,
-          rendered=rendered, response=review, model="claude-haiku-4-5-20251001")
-
-# ── Classify customer support ticket ──────────────────────────────────────────
 ticket = "My order arrived broken. The screen is completely shattered. I want a refund."
 
-classify_prompt = vault.load("classify")
-rendered = classify_prompt.render(
-    text=ticket,
-    categories="refund_request, delivery_issue, technical_support, billing, general_inquiry",
-)
-
-response = client.messages.create(
-    model="claude-haiku-4-5-20251001",
-    max_tokens=32,
-    messages=[{"role": "user", "content": rendered}],
-)
-category = response.content[0].text.strip()
-print(f"\nTicket category: {category}")
-
-vault.log("classify", version=classify_prompt.version,
-          rendered=rendered, response=category, model="claude-haiku-4-5-20251001")
-
-# ── Generate SQL from natural language ─────────────────────────────────────────
 schema = """
 users(id INT, name VARCHAR, email VARCHAR, plan VARCHAR, created_at TIMESTAMP)
 subscriptions(id INT, user_id INT, plan VARCHAR, start_date DATE, end_date DATE, active BOOL)
@@ -64,13 +31,52 @@ payments(id INT, user_id INT, amount DECIMAL, paid_at TIMESTAMP, status VARCHAR)
 
 question = "How many active users are on the pro plan and paid more than 100 euros last month?"
 
-sql_prompt = vault.load("sql_query")
-rendered   = sql_prompt.render(schema=schema, question=question, dialect="PostgreSQL")
 
-response = client.messages.create(
-    model="claude-haiku-4-5-20251001",
-    max_tokens=512,
-    messages=[{"role": "user", "content": rendered}],
-)
-sql = response.content[0].text.strip()
-print(f"\nGenerated SQL:\n{sql}")
+async def complete(content, max_tokens: int) -> str:
+    response = await client.messages.create(
+        model=MODEL,
+        max_tokens=max_tokens,
+        messages=[{"role": "user", "content": content}],
+    )
+    return response.content[0].text.strip()
+
+
+async def main() -> None:
+    review_prompt   = vault.load("code_review")
+    classify_prompt = vault.load("classify")
+    sql_prompt      = vault.load("sql_query")
+
+    # ── Render each prompt once; the rendered text is both sent and logged ─────
+    # render_messages() returns content blocks. code_review is a plain template,
+    # so this is one uncached block; a prompt with a long static `segments`
+    # entry marked `cache: true` would also get a cache_control marker.
+    review_content = review_prompt.render_messages(code=code, language="python")
+    rendered_review = "".join(block["text"] for block in review_content)
+    rendered_classify = classify_prompt.render(
+        text=ticket,
+        categories="refund_request, delivery_issue, technical_support, billing, general_inquiry",
+    )
+    rendered_sql = sql_prompt.render(schema=schema, question=question, dialect="PostgreSQL")
+
+    # ── Code review, ticket classification and SQL generation run concurrently ──
+    review, category, sql = await asyncio.gather(
+        complete(review_content, max_tokens=512),
+        complete(rendered_classify, max_tokens=32),
+        complete(rendered_sql, max_tokens=512),
+    )
+
+    print("Code review:\n", review)
+    print(f"\nTicket category: {category}")
+    print(f"\nGenerated SQL:\n{sql}")
+
+    vault.log("code_review", version=review_prompt.version,
+              rendered=rendered_review, response=review, model=MODEL)
+    vault.log("classify", version=classify_prompt.version,
+              rendered=rendered_classify, response=category, model=MODEL)
+
+    # For large offline jobs (e.g. classifying a backlog of tickets), submit the
+    # rendered prompts with client.messages.batches.create(...) instead — the
+    # Message Batches API processes them asynchronously at a lower price.
+
+
+asyncio.run(main())
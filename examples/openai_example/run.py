@@ -5,14 +5,15 @@ Install: pip install openai promptvault
 Set env: OPENAI_API_KEY=your-key
 """
 
+import asyncio
+import json
 import os
-from openai import OpenAI
+from openai import AsyncOpenAI
 from promptvault import PromptVault
 
-client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
+client = AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
 vault  = PromptVault("../../prompts", log_file="./usage.jsonl")
 
-# ── Summarise a document ───────────────────────────────────────────────────────
 article = """
 The James Webb Space Telescope (JWST) has captured unprecedented images of the
 early universe. Launched in December 2021, the telescope uses infrared light to
@@ -22,29 +23,6 @@ models of galaxy formation. The telescope's mirror, spanning 6.5 metres, allows
 it to detect light from objects over 13 billion light-years away.
 """
 
-prompt = vault.load("summarize")
-rendered = prompt.render(text=article, max_words=50)
-
-response = client.chat.completions.create(
-    model="gpt-4o-mini",
-    messages=[{"role": "user", "content": rendered}],
-)
-result = response.choices[0].message.content
-
-print("Summary:", result)
-
-# Log the call for future reference
-vault.log(
-    "summarize",
-    version=prompt.version,
-    rendered=rendered,
-    response=result,
-    model="gpt-4o-mini",
-)
-
-# ── Extract structured data ────────────────────────────────────────────────────
-import json
-
 cv_text = """
 John Smith — Software Engineer
 Email: john@example.com | Phone: +351 912 345 678
@@ -52,18 +30,44 @@ Currently at Accenture Portugal since 2022.
 Previously worked at NOS Comunicações (2019-2022).
 """
 
-extract_prompt = vault.load("extract_json")
-rendered = extract_prompt.render(
-    text=cv_text,
-    fields="name, email, phone, current_company, previous_company",
-)
 
-response = client.chat.completions.create(
-    model="gpt-4o-mini",
-    messages=[{"role": "user", "content": rendered}],
-)
-data = json.loads(response.choices[0].message.content)
-print("\nExtracted:", data)
+async def complete(rendered: str) -> str:
+    response = await client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[{"role": "user", "content": rendered}],
+    )
+    return response.choices[0].message.content
+
+
+async def main() -> None:
+    # ── Render both prompts up front ───────────────────────────────────────────
+    (summarize, rendered_summary), (extract, rendered_extract) = vault.render_many([
+        ("summarize", {"text": article, "max_words": 50}),
+        ("extract_json", {
+            "text": cv_text,
+            "fields": "name, email, phone, current_company, previous_company",
+        }),
+    ])
+
+    # ── Both calls are independent, so send them concurrently ──────────────────
+    summary, extracted = await asyncio.gather(
+        complete(rendered_summary),
+        complete(rendered_extract),
+    )
+
+    print("Summary:", summary)
+    data = json.loads(extracted)
+    print("\nExtracted:", data)
+
+    # Log the calls for future reference
+    vault.log("summarize", version=summarize.version,
+              rendered=rendered_summary, response=summary, model="gpt-4o-mini")
+    vault.log("extract_json", version=extract.version,
+              rendered=rendered_extract, response=str(data), model="gpt-4o-mini")
+
+    # For large offline jobs (thousands of documents), write the rendered prompts
+    # to a JSONL file and submit them with client.batches.create(...) instead —
+    # the Batch API runs them asynchronously at a lower price.
+
 
-vault.log("extract_json", version=extract_prompt.version,
-          rendered=rendered, response=str(data), model="gpt-4o-mini")
+asyncio.run(main())
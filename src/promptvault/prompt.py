@@ -1,12 +1,60 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
+import sys
+import warnings
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
 from string import Template
-from typing import Any
+from typing import Any, Callable
 
+_TYPE_MAP = {"str": str, "int": int, "float": float, "bool": bool}
 
-@dataclass
+# Providers only cache prefixes above roughly this many tokens; 4 chars/token
+# is the usual rough estimate for English text.
+_MIN_CACHEABLE_TOKENS = 1024
+_CHARS_PER_TOKEN = 4
+
+# slots=True only from 3.11: on 3.10 a frozen slotted dataclass replaces the
+# class's own __getstate__/__setstate__, which Prompt needs for pickling.
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 11) else {}
+
+# render_cached() only memoizes these exact types; containers can compare equal
+# while rendering differently, e.g. (1,) and (1.0,).
+_CACHEABLE_TYPES = frozenset({str, int, float, bool, type(None)})
+
+
+def _compile_render(tmpl: Template) -> Callable[[dict], str] | None:
+    """Turn a Template into a straight-line ``"".join`` over its literals and variables.
+
+    Returns None when the template contains an invalid placeholder, so the
+    caller can fall back to ``Template.substitute`` and its ValueError.
+    """
+    parts, pos = [], 0
+    for m in tmpl.pattern.finditer(tmpl.template):
+        if m.group("invalid") is not None:
+            return None
+        literal = tmpl.template[pos:m.start()]
+        if m.group("escaped") is not None:
+            literal += tmpl.delimiter
+        if literal:
+            parts.append(repr(literal))
+        name = m.group("named") or m.group("braced")
+        if name:
+            parts.append(f"str(v[{name!r}])")
+        pos = m.end()
+    if tmpl.template[pos:]:
+        parts.append(repr(tmpl.template[pos:]))
+    ns: dict[str, Any] = {}
+    exec(f"def _render(v):\n    return ''.join([{', '.join(parts)}])", ns)
+    return ns["_render"]
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class Prompt:
-    """Represents a single loaded prompt with its metadata."""
+    """Represents a single loaded prompt with its metadata.
+
+    Prompts are immutable; the private fields below are caches filled in on
+    first use via ``object.__setattr__``.
+    """
 
     name: str
     version: str
@@ -16,6 +64,39 @@ class Prompt:
     tags: list[str] = field(default_factory=list)
     variables: dict[str, dict] = field(default_factory=dict)
     metadata: dict[str, Any] = field(default_factory=dict)
+    segments: list[dict] = field(default_factory=list)
+    render_cache_size: int = field(default=128, repr=False, compare=False)
+    _compiled: Template | None = field(default=None, init=False, repr=False, compare=False)
+    _ids: frozenset[str] = field(default=frozenset(), init=False, repr=False, compare=False)
+    _required: tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+    _defaults: dict[str, Any] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _type_checks: tuple[tuple[str, type, str], ...] = field(
+        default=(), init=False, repr=False, compare=False
+    )
+    _rendered: OrderedDict = field(
+        default_factory=OrderedDict, init=False, repr=False, compare=False
+    )
+    _segment_templates: tuple[tuple[Template, bool], ...] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _render_fn: Callable[[dict], str] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        # Work out the validation plan once so render() only does the checks.
+        required, type_checks = [], []
+        for var_name, var_meta in self.variables.items():
+            if "default" in var_meta:
+                self._defaults[var_name] = var_meta["default"]
+            elif var_meta.get("required", True):
+                required.append(var_name)
+            expected_type = var_meta.get("type")
+            py_type = _TYPE_MAP.get(expected_type)
+            if py_type:
+                type_checks.append((var_name, py_type, expected_type))
+        object.__setattr__(self, "_required", tuple(required))
+        object.__setattr__(self, "_type_checks", tuple(type_checks))
 
     def render(self, **kwargs: Any) -> str:
         """Render the prompt template with the given variables.
@@ -24,44 +105,170 @@ class Prompt:
             KeyError: if a required variable is missing.
             TypeError: if a variable has the wrong type.
         """
+        merged = self._prepare(kwargs)
+        if self._render_fn is not None:
+            return self._render_fn(merged)
+        return self._compiled.substitute(merged)
+
+    def render_messages(self, **kwargs: Any) -> list[dict]:
+        """Render the prompt as a list of content blocks for chat APIs.
+
+        Consecutive ``segments`` with the same ``cache`` flag are joined into
+        one block, and cacheable blocks carry an ephemeral ``cache_control``
+        marker so providers with prompt caching can reuse the static prefix.
+        A prompt without segments renders to a single uncached block.
+
+        Raises:
+            KeyError: if a required variable is missing.
+            TypeError: if a variable has the wrong type.
+        """
+        merged = self._prepare(kwargs)
+        blocks: list[dict] = []
+        for tmpl, cache in self._segments():
+            text = tmpl.substitute(merged)
+            if blocks and blocks[-1]["_cache"] == cache:
+                blocks[-1]["text"] += text
+            else:
+                blocks.append({"type": "text", "text": text, "_cache": cache})
+        for block in blocks:
+            if block.pop("_cache"):
+                block["cache_control"] = {"type": "ephemeral"}
+        return blocks
+
+    def static_prefix_ratio(self) -> float:
+        """Return the fraction of the template that comes before the first variable.
+
+        Warns when a variable is followed by at least ~1024 tokens of static
+        text, since that text cannot be served from a provider's prompt cache.
+        Move such variables towards the end of the template.
+        """
+        tmpl = self._template()
+        if not self.template:
+            return 1.0
+        spans = [
+            m.span() for m in tmpl.pattern.finditer(self.template)
+            if m.group("named") or m.group("braced")
+        ]
+        if not spans:
+            return 1.0
+        prefix = spans[0][0]
+        static_after = len(self.template) - spans[-1][1] + sum(
+            b[0] - a[1] for a, b in zip(spans, spans[1:])
+        )
+        if static_after // _CHARS_PER_TOKEN >= _MIN_CACHEABLE_TOKENS:
+            warnings.warn(
+                f"[promptvault] Prompt '{self.name}' v{self.version} has about "
+                f"{static_after // _CHARS_PER_TOKEN} tokens of static text after its first "
+                "variable; it cannot be prompt-cached. Move variables to the end.",
+                stacklevel=2,
+            )
+        return prefix / len(self.template)
+
+    def render_cached(self, **kwargs: Any) -> str:
+        """Like render(), but memoizes the result for repeated identical kwargs.
+
+        Keeps the last ``render_cache_size`` results. Only calls whose values
+        are all str, int, float, bool or None are cached; anything else
+        (lists, tuples, dicts, subclasses, ...) goes straight to render().
+        """
+        if self.render_cache_size <= 0:
+            return self.render(**kwargs)
+        parts = []
+        for k, v in kwargs.items():
+            t = type(v)
+            if t not in _CACHEABLE_TYPES:
+                return self.render(**kwargs)
+            # The type is part of the key since 1, 1.0 and True compare equal;
+            # floats key on repr so 0.0 and -0.0 stay apart.
+            parts.append((k, t, repr(v) if t is float else v))
+        key = frozenset(parts)
+        hit = self._rendered.get(key)
+        # Vaults share one Prompt per file, so tolerate another thread evicting
+        # entries between these steps.
+        if hit is not None:
+            try:
+                self._rendered.move_to_end(key)
+            except KeyError:
+                pass
+            return hit
+        text = self.render(**kwargs)
+        self._rendered[key] = text
+        while len(self._rendered) > self.render_cache_size:
+            try:
+                self._rendered.popitem(last=False)
+            except KeyError:
+                break
+        return text
+
+    def _template(self) -> Template:
+        # Built once on first render and reused for every subsequent call.
+        if self._compiled is None:
+            tmpl = Template(self.template)
+            object.__setattr__(self, "_ids", frozenset(
+                m.group("named") or m.group("braced")
+                for m in tmpl.pattern.finditer(self.template)
+                if m.group("named") or m.group("braced")
+            ))
+            object.__setattr__(self, "_render_fn", _compile_render(tmpl))
+            object.__setattr__(self, "_compiled", tmpl)
+        return self._compiled
+
+    def _segments(self) -> tuple[tuple[Template, bool], ...]:
+        if self._segment_templates is None:
+            if self.segments:
+                object.__setattr__(self, "_segment_templates", tuple(
+                    (Template(seg["template"]), bool(seg.get("cache", False)))
+                    for seg in self.segments
+                ))
+            else:
+                object.__setattr__(self, "_segment_templates", ((self._template(), False),))
+        return self._segment_templates
+
+    def _prepare(self, kwargs: dict) -> dict:
         self._validate(kwargs)
         merged = self._apply_defaults(kwargs)
-        try:
-            return Template(self.template).substitute(merged)
-        except KeyError as e:
+        self._template()
+        missing = self._ids - merged.keys()
+        if missing:
             raise KeyError(
-                f"[promptvault] Missing variable {e} in prompt '{self.name}' v{self.version}. "
-                f"Expected variables: {list(self.variables.keys())}"
-            ) from e
+                f"[promptvault] Missing variable {min(missing)!r} in prompt '{self.name}' "
+                f"v{self.version}. Expected variables: {list(self.variables.keys())}"
+            )
+        return merged
 
     def _validate(self, kwargs: dict) -> None:
-        for var_name, var_meta in self.variables.items():
-            required = var_meta.get("required", True)
-            has_default = "default" in var_meta
-            if required and not has_default and var_name not in kwargs:
+        for var_name in self._required:
+            if var_name not in kwargs:
                 raise KeyError(
                     f"[promptvault] Required variable '{var_name}' missing for prompt "
                     f"'{self.name}' v{self.version}."
                 )
-            expected_type = var_meta.get("type")
-            if expected_type and var_name in kwargs:
-                type_map = {"str": str, "int": int, "float": float, "bool": bool}
-                py_type = type_map.get(expected_type)
-                if py_type and not isinstance(kwargs[var_name], py_type):
-                    raise TypeError(
-                        f"[promptvault] Variable '{var_name}' in prompt '{self.name}' "
-                        f"expected {expected_type}, got {type(kwargs[var_name]).__name__}."
-                    )
+        for var_name, py_type, expected_type in self._type_checks:
+            if var_name in kwargs and not isinstance(kwargs[var_name], py_type):
+                raise TypeError(
+                    f"[promptvault] Variable '{var_name}' in prompt '{self.name}' "
+                    f"expected {expected_type}, got {type(kwargs[var_name]).__name__}."
+                )
 
     def _apply_defaults(self, kwargs: dict) -> dict:
-        merged = {}
-        for var_name, var_meta in self.variables.items():
-            if var_name in kwargs:
-                merged[var_name] = kwargs[var_name]
-            elif "default" in var_meta:
-                merged[var_name] = var_meta["default"]
-        merged.update({k: v for k, v in kwargs.items() if k not in merged})
-        return merged
+        return {**self._defaults, **kwargs}
+
+    def __getstate__(self) -> dict:
+        # The generated render function can't be pickled; drop it and the other
+        # lazy caches so they are rebuilt on first render after unpickling.
+        state = {f.name: getattr(self, f.name) for f in fields(self)}
+        state.update(
+            _compiled=None, _ids=frozenset(), _render_fn=None,
+            _segment_templates=None, _rendered=OrderedDict(),
+        )
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        for key, value in state.items():
+            object.__setattr__(self, key, value)
+
+    def __hash__(self) -> int:
+        return hash((self.name, self.version))
 
     def __repr__(self) -> str:
         return f"Prompt(name={self.name!r}, version={self.version!r})"
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+
+def ts_to_iso(ns: int) -> str:
+    """Convert a ``ts_ns`` log value (nanoseconds since the epoch) to UTC ISO-8601."""
+    seconds, rem = divmod(ns, 1_000_000_000)
+    dt = datetime.fromtimestamp(seconds, tz=timezone.utc).replace(microsecond=rem // 1000)
+    return dt.isoformat(timespec="milliseconds")
@@ -1,15 +1,203 @@
 from __future__ import annotations
 
+import dataclasses
+import difflib
+import functools
 import json
+import mmap
 import os
-from datetime import datetime
+import queue
+import re
+import threading
+import time
+import warnings
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dtime, timezone
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+try:  # libyaml-backed loader is several times faster when available
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader as _Loader
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 from .prompt import Prompt
 
+_LOG_QUEUE_SIZE = 10_000
+_LOG_BATCH = 256
+# Files larger than this are parsed from a memory map instead of being read
+# into a bytes object first; below it the mmap setup costs more than it saves.
+_MMAP_MIN_SIZE = 32 * 1024
+# Below this many files a thread pool costs more than it saves.
+_PARALLEL_SCAN_MIN = 16
+
+
+_VERSION_PREFIX = re.compile(r"^[vV](?=\d)")
+_VERSION_PART = re.compile(r"(\d*)(.*)")
+
+
+def _version_key(version: str) -> tuple:
+    # Numeric, part-by-part ordering so "1.10" > "1.9"; a suffixed part sorts
+    # before the plain release ("1.0rc1" < "1.0"). A leading "v" is ignored.
+    key = []
+    for part in _VERSION_PREFIX.sub("", str(version)).split("."):
+        num, rest = _VERSION_PART.match(part).groups()
+        key.append((int(num) if num else -1, 0 if rest else 1, rest))
+    return tuple(key)
+
+
+@functools.lru_cache(maxsize=64)
+def _unified_diff(text_a: str, text_b: str, fromfile: str, tofile: str) -> str:
+    # difflib is pure Python; comparing the same two templates again (e.g. in
+    # a review loop) is served from here instead of re-running the matcher.
+    delta = difflib.unified_diff(
+        text_a.splitlines(keepends=True), text_b.splitlines(keepends=True),
+        fromfile=fromfile, tofile=tofile,
+    )
+    return "".join(delta) or "(no differences)"
+
+
+def _json_default(o: Any) -> Any:
+    # Shared by both encoders so a record looks the same whichever one writes
+    # it; anything unknown is written as its str() rather than dropped, since
+    # a record that fails here can no longer raise in the caller.
+    if isinstance(o, (date, dtime)):
+        return o.isoformat()
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    return str(o)
+
+
+# orjson would otherwise format datetimes and dataclasses itself.
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson is not None else 0
+)
+
+
+def _dump_line(record: dict) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(record, default=_json_default, option=_ORJSON_OPTIONS) + b"\n"
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits, which stdlib json handles
+    try:
+        text = json.dumps(
+            record, ensure_ascii=False, default=_json_default, separators=(",", ":")
+        )
+        return (text + "\n").encode("utf-8")
+    except UnicodeEncodeError:
+        # Lone surrogates can't be encoded as UTF-8; escape them as \uXXXX.
+        text = json.dumps(record, default=_json_default, separators=(",", ":"))
+        return (text + "\n").encode("ascii")
+
+
+class _LogWriter:
+    """Background writer for one open log file.
+
+    Records are serialized and written by a daemon thread so log() returns
+    immediately. The writer holds no reference to its vault, so a vault that
+    is no longer used can be collected; its finalizer closes the writer then,
+    or at interpreter exit.
+    """
+
+    def __init__(self, path: Path, flush_every: int):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(path, "ab", buffering=64 * 1024)
+        self._flush_every = flush_every
+        self._pending = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._q: queue.Queue = queue.Queue(maxsize=_LOG_QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, name="promptvault-log", daemon=True)
+        self._thread.start()
+
+    def put(self, record: dict) -> bool:
+        """Queue a record; returns False if the writer was closed meanwhile."""
+        with self._lock:
+            # Enqueue under the lock so nothing can land behind close()'s sentinel.
+            if self._closed:
+                return False
+            try:
+                self._q.put_nowait(record)
+                return True
+            except queue.Full:
+                pass
+        # The thread is behind; write on the caller thread instead.
+        return self._write([record])
+
+    def flush(self) -> None:
+        self._q.join()
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.flush()
+            self._pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        try:
+            self._q.put(None, timeout=5)
+        except queue.Full:
+            pass  # thread is stuck behind a full queue; don't hang at exit
+        else:
+            self._thread.join(timeout=5)
+        with self._lock:
+            self._fh.close()
+            self._pending = 0
+
+    def _run(self) -> None:
+        q = self._q
+        while True:
+            batch = [q.get()]
+            while len(batch) < _LOG_BATCH:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write([r for r in batch if r is not None])
+            except Exception as e:
+                # Keep the thread alive: with no reader, flush() would block forever.
+                warnings.warn(f"[promptvault] Failed to write usage log: {e}")
+            finally:
+                for _ in batch:
+                    q.task_done()
+            if any(r is None for r in batch):
+                return
+
+    def _write(self, records: list[dict]) -> bool:
+        lines = []
+        for record in records:
+            try:
+                lines.append(_dump_line(record))
+            except (TypeError, ValueError) as e:
+                warnings.warn(
+                    f"[promptvault] Skipped usage log record for prompt "
+                    f"{record.get('prompt')!r}: {e}"
+                )
+        with self._lock:
+            if self._fh.closed:  # closed while the thread was still busy
+                return False
+            self._fh.write(b"".join(lines))
+            self._pending += len(lines)
+            if self._flush_every and self._pending >= self._flush_every:
+                self._fh.flush()
+                self._pending = 0
+        return True
+
 
 class PromptVault:
     """Load, manage and log prompts stored as YAML files.
@@ -17,16 +205,48 @@ class PromptVault:
     Args:
         path: Directory containing your .yaml prompt files.
         log_file: Optional path to a JSONL file where usage is logged.
+        render_cache_size: How many results each loaded prompt keeps for
+            ``render_cached()``. 0 disables the cache.
+        flush_every: Flush the log file after this many records. 0 (default)
+            leaves flushing to the write buffer, ``flush()`` and interpreter
+            exit; use 1 while developing to see every record immediately.
+        timestamp: ``"iso"`` (default) records a UTC ISO-8601 ``timestamp``;
+            ``"epoch_ns"`` records integer nanoseconds as ``ts_ns`` instead,
+            which is cheaper to produce (see ``promptvault.util.ts_to_iso``).
     """
 
-    def __init__(self, path: str | Path, log_file: str | Path | None = None):
+    def __init__(
+        self,
+        path: str | Path,
+        log_file: str | Path | None = None,
+        render_cache_size: int = 128,
+        flush_every: int = 0,
+        timestamp: str = "iso",
+    ):
         self._path = Path(path)
         if not self._path.exists():
             raise FileNotFoundError(
                 f"[promptvault] Prompt directory not found: {self._path.resolve()}\n"
                 "Create it and add your .yaml prompt files there."
             )
+        if timestamp not in ("iso", "epoch_ns"):
+            raise ValueError(
+                f"[promptvault] Unknown timestamp format {timestamp!r}; "
+                "use 'iso' or 'epoch_ns'."
+            )
         self._log_file = Path(log_file) if log_file else None
+        self._epoch_ts = timestamp == "epoch_ns"
+        self._cache: dict[Path, tuple[int, int, dict]] = {}
+        self._prompts: dict[Path, tuple[dict, Prompt]] = {}
+        self._index: dict[str, list[Path]] | None = None
+        self._index_mtime: int | None = None
+        self._index_stats: dict[Path, tuple[int, int]] = {}
+        self._names: list[str] = []
+        self._render_cache_size = render_cache_size
+        self._flush_every = flush_every
+        self._writer: _LogWriter | None = None
+        self._writer_finalizer: weakref.finalize | None = None
+        self._writer_lock = threading.Lock()
 
     # ── Public API ───────────────────────────────────────────────────────────
 
@@ -51,45 +271,81 @@ class PromptVault:
             )
 
         if version is not None:
-            match = next((p for p in candidates if p["version"] == version), None)
+            match = next((c for c in candidates if c[0] == str(version)), None)
             if match is None:
-                available = [p["version"] for p in candidates]
+                available = [v for v, _ in candidates]
                 raise FileNotFoundError(
                     f"[promptvault] Prompt '{name}' version '{version}' not found.\n"
                     f"Available versions: {available}"
                 )
-            return self._parse(match)
-
-        # Latest version = highest semver or last alphabetically
-        latest = sorted(candidates, key=lambda p: p["version"])[-1]
-        return self._parse(latest)
+        else:
+            match = max(candidates, key=lambda c: _version_key(c[0]))
+        found_version, path = match
+        data = self._load_yaml(path)
+        # Reuse the Prompt (and its compiled template and render_cached results)
+        # while the YAML cache still returns the same parsed dict, i.e. while
+        # the file's mtime and size are unchanged.
+        cached = self._prompts.get(path)
+        if cached is not None and cached[0] is data:
+            return cached[1]
+        # The index is authoritative: for `<name>@<version>.yaml` files the
+        # filename wins over (possibly absent or unquoted) fields in the file.
+        prompt = self._parse({**data, "name": name, "version": found_version})
+        self._prompts[path] = (data, prompt)
+        return prompt
 
     def list(self) -> list[str]:
         """Return all prompt names available in the vault."""
-        names = set()
-        for f in self._path.glob("*.yaml"):
-            data = yaml.safe_load(f.read_text(encoding="utf-8")) or {}
-            names.add(data.get("name", f.stem))
-        return sorted(names)
+        self._refresh_index()
+        return list(self._names)
 
     def versions(self, name: str) -> list[str]:
         """Return all available versions for a given prompt name."""
-        return sorted(p["version"] for p in self._find_files(name))
+        return sorted((v for v, _ in self._find_files(name)), key=_version_key)
+
+    def render_many(
+        self, specs: list[tuple[str, dict[str, Any]]]
+    ) -> list[tuple[Prompt, str]]:
+        """Render several prompts in one pass, e.g. before firing concurrent LLM calls.
+
+        Args:
+            specs: ``(name, variables)`` pairs; each name is loaded (latest
+                version) once and reused for every spec that refers to it.
+
+        Returns:
+            ``(prompt, text)`` pairs in the same order as ``specs``, so callers
+            can log ``prompt.version`` without loading the prompt again.
+        """
+        prompts: dict[str, Prompt] = {}
+        rendered = []
+        for name, variables in specs:
+            if name not in prompts:
+                prompts[name] = self.load(name)
+            prompt = prompts[name]
+            rendered.append((prompt, prompt.render(**variables)))
+        return rendered
 
     def diff(self, name: str, version_a: str, version_b: str) -> str:
         """Return a unified text diff between two versions of a prompt template."""
-        import difflib
-
         a = self.load(name, version=version_a)
         b = self.load(name, version=version_b)
-        lines_a = a.template.splitlines(keepends=True)
-        lines_b = b.template.splitlines(keepends=True)
-        delta = difflib.unified_diff(
-            lines_a, lines_b,
-            fromfile=f"{name} v{version_a}",
-            tofile=f"{name} v{version_b}",
+        return _unified_diff(
+            a.template, b.template, f"{name} v{version_a}", f"{name} v{version_b}"
         )
-        return "".join(delta) or "(no differences)"
+
+    def reload(self) -> None:
+        """Drop all cached prompt files so the next call re-reads them from disk.
+
+        Edits are picked up on their own: files whose mtime or size changed
+        are re-parsed, and the name index is rebuilt when files are added,
+        removed or renamed, or when any parsed file changes on disk. This is
+        only needed when an edit keeps a file's size and lands within the
+        filesystem's timestamp resolution.
+        """
+        self._cache.clear()
+        self._prompts.clear()
+        self._index = self._index_mtime = None
+        self._index_stats = {}
 
     def log(
         self,
@@ -113,8 +369,12 @@ class PromptVault:
         """
         if self._log_file is None:
             return
+        if self._epoch_ts:
+            stamp = {"ts_ns": time.time_ns()}
+        else:
+            stamp = {"timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds")}
         record = {
-            "timestamp": datetime.utcnow().isoformat(),
+            **stamp,
             "prompt": name,
             "version": version,
             "model": model,
@@ -122,30 +382,135 @@ class PromptVault:
             "response": response,
             **(extra or {}),
         }
-        self._log_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self._log_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        while True:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._open_log()
+                writer = self._writer
+            if writer.put(record):
+                return
+            # close() ran concurrently; the next pass opens a fresh writer.
+
+    def flush(self) -> None:
+        """Write all queued and buffered log records to disk."""
+        writer = self._writer
+        if writer is not None:
+            writer.flush()
+
+    def close(self) -> None:
+        """Flush and close the log file. Logging again reopens it."""
+        with self._writer_lock:
+            finalizer = self._writer_finalizer
+            self._writer = self._writer_finalizer = None
+        if finalizer is not None:
+            finalizer()  # runs _LogWriter.close once and detaches the exit hook
 
     # ── Internal ─────────────────────────────────────────────────────────────
 
-    def _find_files(self, name: str) -> list[dict]:
-        results = []
-        for f in self._path.glob("*.yaml"):
-            data = yaml.safe_load(f.read_text(encoding="utf-8")) or {}
-            if data.get("name") == name:
-                results.append({**data, "_file": f})
-        return results
+    def _open_log(self) -> None:
+        # Called with _writer_lock held. The file stays open until close(),
+        # until this vault is garbage-collected, or until interpreter exit;
+        # weakref.finalize covers the last two without keeping the vault alive.
+        self._writer = _LogWriter(self._log_file, self._flush_every)
+        self._writer_finalizer = weakref.finalize(self, self._writer.close)
+
+    def _refresh_index(self) -> None:
+        # Map prompt names to their files. Rebuilt when the directory listing
+        # changes (its mtime moves on add/remove/rename) or when a parsed file
+        # changes in place, since its `name` may have changed. Files named
+        # "<name>@<version>.yaml" are indexed from the filename alone.
+        mtime = self._path.stat().st_mtime_ns
+        if self._index is not None and mtime == self._index_mtime and self._index_fresh():
+            return
+        index: dict[str, list[tuple[Path, str | None]]] = {}
+        to_parse: list[os.DirEntry] = []
+        with os.scandir(self._path) as it:
+            for entry in it:
+                if not (entry.name.endswith(".yaml") and entry.is_file()):
+                    continue
+                name, sep, version = entry.name[:-5].partition("@")
+                if sep and name and version:
+                    index.setdefault(name, []).append((Path(entry.path), version))
+                else:
+                    to_parse.append(entry)
+        if len(to_parse) >= _PARALLEL_SCAN_MIN:
+            # stat/read release the GIL, so a cold scan of a large vault
+            # overlaps its disk I/O across threads (parsing itself does not).
+            with ThreadPoolExecutor(max_workers=min(32, len(to_parse))) as ex:
+                parsed = list(ex.map(self._load_entry, to_parse))
+        else:
+            parsed = [self._load_entry(e) for e in to_parse]
+        names = set(index)
+        stats = {}
+        for entry, data in zip(to_parse, parsed):
+            st = entry.stat()
+            stats[Path(entry.path)] = (st.st_mtime_ns, st.st_size)
+            names.add(data.get("name", entry.name[:-5]))
+            if "name" in data:
+                index.setdefault(data["name"], []).append((Path(entry.path), None))
+        self._index, self._index_mtime, self._names = index, mtime, sorted(names)
+        self._index_stats = stats
+
+    def _index_fresh(self) -> bool:
+        # One stat per parsed file; unchanged files are never re-read.
+        for path, key in self._index_stats.items():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                return False
+            if (st.st_mtime_ns, st.st_size) != key:
+                return False
+        return True
+
+    def _find_files(self, name: str) -> list[tuple[str, Path]]:
+        # (version, path) pairs; only files without a version in their name
+        # are opened, and those come from the parse cache.
+        self._refresh_index()
+        found = []
+        for f, version in self._index.get(name, []):
+            if version is None:
+                data = self._load_yaml(f)
+                if data.get("name") != name:  # changed since the index was built
+                    continue
+                version = str(data.get("version", "1.0"))
+            found.append((version, f))
+        return found
+
+    def _load_entry(self, entry: os.DirEntry) -> dict:
+        # DirEntry caches its stat result, so the cache check reuses it.
+        return self._load_yaml(Path(entry.path), entry.stat())
+
+    def _load_yaml(self, path: Path, st: os.stat_result | None = None) -> dict:
+        # Unchanged files (same mtime and size) are served from memory.
+        if st is None:
+            st = path.stat()
+        cached = self._cache.get(path)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2]
+        if st.st_size > _MMAP_MIN_SIZE:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data = yaml.load(mm, Loader=_Loader) or {}
+        else:
+            data = yaml.load(path.read_bytes(), Loader=_Loader) or {}
+        self._cache[path] = (st.st_mtime_ns, st.st_size, data)
+        return data
 
     def _parse(self, data: dict) -> Prompt:
+        segments = data.get("segments") or []
+        template = data["template"] if not segments else "".join(
+            seg["template"] for seg in segments
+        )
         return Prompt(
             name=data["name"],
             version=str(data.get("version", "1.0")),
-            template=data["template"],
+            template=template,
             description=data.get("description", ""),
             author=data.get("author", ""),
             tags=data.get("tags", []),
             variables=data.get("variables", {}),
+            segments=segments,
             metadata={k: v for k, v in data.items()
                       if k not in ("name", "version", "template", "description",
-                                   "author", "tags", "variables", "_file")},
+                                   "author", "tags", "variables", "segments", "_file")},
+            render_cache_size=self._render_cache_size,
         )
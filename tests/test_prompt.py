@@ -0,0 +1,76 @@
+import pickle
+from string import Template
+
+import pytest
+
+from promptvault import Prompt
+
+
+def make_prompt(template="Hello $name, you are $age.", **kwargs):
+    return Prompt(
+        name="greet",
+        version="1.0",
+        template=template,
+        variables={"name": {"type": "str"}, "age": {"type": "int", "default": 30}},
+        **kwargs,
+    )
+
+
+def test_pickle_round_trip_after_render():
+    prompt = make_prompt()
+    rendered = prompt.render(name="Ana")
+    prompt.render_cached(name="Ana")
+
+    restored = pickle.loads(pickle.dumps(prompt))
+
+    assert restored == prompt
+    assert hash(restored) == hash(prompt)
+    assert restored.render(name="Ana") == rendered
+
+
+def test_render_cached_does_not_conflate_equal_values():
+    prompt = make_prompt(template="$value")
+    assert prompt.render_cached(name="Ana", value=(1,)) == "(1,)"
+    assert prompt.render_cached(name="Ana", value=(1.0,)) == "(1.0,)"
+    assert prompt.render_cached(name="Ana", value=1) == "1"
+    assert prompt.render_cached(name="Ana", value=True) == "True"
+    assert prompt.render_cached(name="Ana", value=0.0) == "0.0"
+    assert prompt.render_cached(name="Ana", value=-0.0) == "-0.0"
+    assert len(prompt._rendered) == 4  # the tuples were not cached
+
+
+@pytest.mark.parametrize("template", [
+    "Hello $name, you are $age.",
+    "${name}${age}$name",
+    "Cost: $$5 for $name",
+    "quotes ' \" \\ and {braces} for $name",
+    "línea\n\tcon $name\n",
+    "no variables at all",
+    "",
+])
+def test_render_matches_template_substitute(template):
+    prompt = make_prompt(template=template)
+    assert prompt.render(name="Ana") == Template(template).substitute(name="Ana", age=30)
+    assert prompt.render(name="Ana", age=41) == Template(template).substitute(name="Ana", age=41)
+
+
+def test_render_invalid_placeholder_raises_like_substitute():
+    prompt = make_prompt(template="Hello $name, pay $5")
+    with pytest.raises(ValueError):
+        Template(prompt.template).substitute(name="Ana")
+    with pytest.raises(ValueError):
+        prompt.render(name="Ana")
+
+
+def test_pickle_round_trip_before_render_and_with_segments():
+    fresh = make_prompt()
+    assert pickle.loads(pickle.dumps(fresh)).render(name="Ana") == fresh.render(name="Ana")
+
+    segmented = make_prompt(segments=[
+        {"template": "Static rules.\n", "cache": True},
+        {"template": "Hello $name."},
+    ])
+    blocks = segmented.render_messages(name="Ana")
+    restored = pickle.loads(pickle.dumps(segmented))
+    assert restored.render_messages(name="Ana") == blocks
+    assert blocks[0]["cache_control"] == {"type": "ephemeral"}
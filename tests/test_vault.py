@@ -0,0 +1,189 @@
+import gc
+import json
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+
+import pytest
+
+from promptvault import PromptVault
+from promptvault import vault as vault_module
+
+
+def write(path, text):
+    # Bump mtime explicitly so edits are visible even on coarse-timestamp filesystems.
+    st = path.stat() if path.exists() else None
+    path.write_text(text, encoding="utf-8")
+    if st is not None:
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def read_log(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def prompt_yaml(name, version, template="Hello $who"):
+    return f'name: {name}\nversion: "{version}"\ntemplate: "{template}"\n'
+
+
+@pytest.fixture
+def vault_dir(tmp_path):
+    write(tmp_path / "a.yaml", prompt_yaml("a", "1.9"))
+    write(tmp_path / "a2.yaml", prompt_yaml("a", "1.10"))
+    write(tmp_path / "c.yaml", prompt_yaml("c", "5.0"))
+    return tmp_path
+
+
+def test_latest_version_is_numeric(vault_dir):
+    vault = PromptVault(vault_dir)
+    assert vault.versions("a") == ["1.9", "1.10"]
+    assert vault.load("a").version == "1.10"
+
+
+def test_in_place_rename_gains_name(vault_dir):
+    vault = PromptVault(vault_dir)
+    assert vault.load("a").version == "1.10"
+
+    write(vault_dir / "c.yaml", prompt_yaml("a", "5.0"))
+
+    assert vault.versions("a") == ["1.9", "1.10", "5.0"]
+    assert vault.load("a").version == "5.0"
+    assert vault.list() == ["a"]
+
+
+def test_in_place_rename_loses_name(vault_dir):
+    vault = PromptVault(vault_dir)
+    assert vault.load("c").name == "c"
+
+    write(vault_dir / "c.yaml", prompt_yaml("z", "5.0"))
+
+    with pytest.raises(FileNotFoundError):
+        vault.load("c")
+    assert vault.load("z").name == "z"
+    assert vault.list() == ["a", "z"]
+
+
+def test_at_file_filename_is_authoritative(tmp_path):
+    write(tmp_path / "g@1.0.yaml", 'name: h\ntemplate: "Hi"\n')
+    write(tmp_path / "f@1.10.yaml", 'version: 1.10\ntemplate: "Hi"\n')
+    vault = PromptVault(tmp_path)
+
+    assert vault.list() == ["f", "g"]
+    assert vault.load("g").name == "g"
+    prompt = vault.load("f")
+    assert (prompt.name, prompt.version) == ("f", "1.10")
+    assert vault.load("f", version="1.10") is prompt
+
+
+def test_render_many_returns_prompts_with_texts(vault_dir):
+    vault = PromptVault(vault_dir)
+    (first, text_a), (second, text_b) = vault.render_many([
+        ("a", {"who": "Ana"}),
+        ("a", {"who": "Rui"}),
+    ])
+    assert first is second is vault.load("a")
+    assert (text_a, text_b) == ("Hello Ana", "Hello Rui")
+
+
+def test_log_encoders_agree(monkeypatch):
+    @dataclass
+    class Usage:
+        tokens: int
+
+    record = {
+        "prompt": "a",
+        "at": datetime(2025, 3, 15, 14, 22, 1, 123000, tzinfo=timezone.utc),
+        "day": date(2025, 3, 15),
+        "usage": Usage(12),
+        "tags": ["x", "é"],
+        "score": 0.5,
+    }
+    fast = vault_module._dump_line(record)
+    monkeypatch.setattr(vault_module, "orjson", None)
+    assert vault_module._dump_line(record) == fast
+    assert fast.startswith(b'{"prompt":"a","at":"2025-03-15T14:22:01.123000+00:00",')
+
+
+def test_log_close_races_lose_no_records(vault_dir, tmp_path):
+    log_file = tmp_path / "logs" / "usage.jsonl"
+    vault = PromptVault(vault_dir, log_file=log_file)
+
+    def worker(n):
+        for i in range(200):
+            vault.log("a", extra={"n": n, "i": i})
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for _ in range(20):
+        vault.close()
+    for t in threads:
+        t.join()
+    vault.close()
+
+    assert len(read_log(log_file)) == 800
+
+
+def test_unused_vault_is_collected_and_closes_its_log(vault_dir, tmp_path):
+    log_file = tmp_path / "usage.jsonl"
+    vault = PromptVault(vault_dir, log_file=log_file)
+    vault.log("a")
+    writer = vault._writer
+    ref = weakref.ref(vault)
+    del vault
+    gc.collect()
+
+    assert ref() is None
+    assert writer._fh.closed
+    assert len(read_log(log_file)) == 1
+
+
+def test_log_flush_close_and_reopen(vault_dir, tmp_path):
+    log_file = tmp_path / "usage.jsonl"
+    vault = PromptVault(vault_dir, log_file=log_file)
+    vault.flush()  # nothing logged yet
+    assert not log_file.exists()
+
+    vault.log("a", version="1.10", rendered="Hello Ana", response="Hi")
+    vault.flush()
+    assert [r["response"] for r in read_log(log_file)] == ["Hi"]
+
+    vault.close()
+    vault.close()  # idempotent
+    vault.log("a", response="again")  # reopens and appends
+    vault.close()
+    records = read_log(log_file)
+    assert [r["response"] for r in records] == ["Hi", "again"]
+    assert records[0]["version"] == "1.10" and "timestamp" in records[0]
+
+
+def test_log_flush_every_writes_without_flush(vault_dir, tmp_path):
+    log_file = tmp_path / "usage.jsonl"
+    vault = PromptVault(vault_dir, log_file=log_file, flush_every=1, timestamp="epoch_ns")
+    vault.log("a")
+    deadline = time.monotonic() + 5
+    while not log_file.read_bytes() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert isinstance(read_log(log_file)[0]["ts_ns"], int)
+    vault.close()
+
+
+def test_log_skips_bad_records(vault_dir, tmp_path):
+    log_file = tmp_path / "usage.jsonl"
+    vault = PromptVault(vault_dir, log_file=log_file)
+    circular = {}
+    circular["self"] = circular
+
+    with pytest.warns(UserWarning, match="Skipped usage log record"):
+        vault.log("a", extra={"bad": {(1, 2): "tuple key"}})
+        vault.log("a", extra={"bad": circular})
+        vault.log("a", extra={"n": 2**70, "obj": object()})
+        vault.flush()
+    vault.close()
+
+    (record,) = read_log(log_file)
+    assert record["n"] == 2**70
+    assert record["obj"].startswith("<object object")